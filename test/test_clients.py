@@ -0,0 +1,173 @@
+from xrplpers.clients import ClientPool, NoHealthyNodeError
+from xrplpers.replay.cassette import Cassette, request_key
+from xrplpers.replay.servers import Faults, HTTPStandIn
+import asyncio
+import time
+import unittest
+from xrpl.asyncio.clients.client import Client
+from xrpl.models.requests import AccountInfo, SubmitOnly, Tx
+from xrpl.models.response import Response, ResponseStatus
+
+
+class StubNode(Client):
+    """
+    Answers server_info, submit and tx locally after `latency` seconds.
+    """
+
+    def __init__(self, url, latency=0.0, ledger=100, state="full", down=False):
+        super().__init__(url)
+        self.latency = latency
+        self.ledger = ledger
+        self.state = state
+        self.down = down
+        self.engine_result = "tesSUCCESS"
+        self.calls = []
+
+    async def _request_impl(self, request):
+        await asyncio.sleep(self.latency)
+        if self.down:
+            raise ConnectionError(self.url)
+        method = request.method.value
+        self.calls.append(method)
+        if method == "server_info":
+            result = {
+                "info": {
+                    "server_state": self.state,
+                    "validated_ledger": {"seq": self.ledger},
+                }
+            }
+        elif method == "submit":
+            result = {
+                "engine_result": self.engine_result,
+                "tx_json": {"hash": "ABC", "LastLedgerSequence": 110},
+            }
+        elif method == "tx":
+            result = {"hash": request.transaction, "validated": True}
+        else:
+            result = {"node": self.url}
+        return Response(status=ResponseStatus.SUCCESS, result=result)
+
+
+def rippled_cassette(name, ledger=100):
+    """
+    server_info and account_info recordings for a stand-in rippled node that
+    answers account_info with its `name`.
+    """
+    results = {
+        "server_info": {
+            "info": {"server_state": "full", "validated_ledger": {"seq": ledger}}
+        },
+        "account_info": {"node": name},
+    }
+    cassette = Cassette()
+    for method, result in results.items():
+        cassette.record(
+            request_key("POST", "/", {"method": method}),
+            {},
+            {"status": 200, "body": {"result": dict(result, status="success")}},
+        )
+    return cassette
+
+
+class testClientPool(unittest.TestCase):
+    def setUp(self):
+        self.account = AccountInfo(account="rJhSM8539zfoQwq7NomvEvt9xSbppf38Ng")
+
+    def testRoutesToFastestNode(self):
+        pool = ClientPool([StubNode("slow", 0.02), StubNode("fast", 0.001)])
+        self.assertEqual(pool.request(self.account).result["node"], "fast")
+
+    def testSkipsLaggingNode(self):
+        pool = ClientPool([StubNode("behind", 0.0, ledger=90), StubNode("ok", 0.01)])
+        self.assertEqual(pool.request(self.account).result["node"], "ok")
+
+    def testSkipsUnsyncedNode(self):
+        pool = ClientPool(
+            [StubNode("syncing", 0.0, state="connected"), StubNode("ok", 0.01)]
+        )
+        self.assertEqual(pool.request(self.account).result["node"], "ok")
+
+    def testFailover(self):
+        flaky = StubNode("flaky", 0.0)
+        pool = ClientPool([flaky, StubNode("ok", 0.01)])
+        pool.request(self.account)
+        flaky.down = True
+        self.assertEqual(pool.request(self.account).result["node"], "ok")
+
+    def testAllNodesDown(self):
+        pool = ClientPool([StubNode("a", down=True), StubNode("b", down=True)])
+        with self.assertRaises(NoHealthyNodeError):
+            pool.request(self.account)
+
+    def testSubmissionPinnedUntilValidated(self):
+        slow = StubNode("slow", 0.02)
+        fast = StubNode("fast", 0.001)
+        pool = ClientPool([slow, fast])
+        pool.request(SubmitOnly(tx_blob="00"))
+        self.assertIs(pool.pinned["ABC"].node.client, fast)
+        # fast node now looks slower, but the tx lookup stays on it
+        fast.latency, slow.latency = 0.02, 0.001
+        pool.check_interval = 0
+        pool.request(Tx(transaction="ABC"))
+        pool._refresh.join()
+        self.assertIn("tx", fast.calls)
+        self.assertNotIn("tx", slow.calls)
+        self.assertNotIn("ABC", pool.pinned)
+
+    def testFailedSubmissionNotPinned(self):
+        node = StubNode("a")
+        node.engine_result = "temMALFORMED"
+        pool = ClientPool([node])
+        pool.request(SubmitOnly(tx_blob="00"))
+        self.assertEqual(pool.pinned, {})
+
+    def testPinExpiresPastLastLedgerSequence(self):
+        node = StubNode("a")
+        pool = ClientPool([node], check_interval=0)
+        pool.request(SubmitOnly(tx_blob="00"))
+        self.assertIn("ABC", pool.pinned)
+        node.ledger = 111
+        asyncio.run(pool.check_health())
+        self.assertNotIn("ABC", pool.pinned)
+
+    def testPinExpiresWithAge(self):
+        pool = ClientPool([StubNode("a")], pin_ttl=0)
+        pool.request(SubmitOnly(tx_blob="00"))
+        pool.expire_pins()
+        self.assertEqual(pool.pinned, {})
+
+    def testHungNodeDoesNotSlowReads(self):
+        hung = StubNode("hung", 3.0, down=True)
+        pool = ClientPool(
+            [hung, StubNode("ok", 0.001)], check_interval=0, health_timeout=1
+        )
+        # The first request has no ranking yet, so waits out the timeout
+        pool.request(self.account)
+        self.assertFalse(pool.nodes[0].healthy)
+        start = time.monotonic()
+        for _ in range(5):
+            self.assertEqual(pool.request(self.account).result["node"], "ok")
+        # Later refreshes run in the background rather than in each request
+        self.assertLess(time.monotonic() - start, 0.5)
+        pool._refresh.join()
+
+
+class testClientPoolOverHTTP(unittest.TestCase):
+    def setUp(self):
+        self.slow = HTTPStandIn(rippled_cassette("slow"), Faults(latency=0.1)).start()
+        self.fast = HTTPStandIn(rippled_cassette("fast")).start()
+        self.lagging = HTTPStandIn(rippled_cassette("lagging", ledger=90)).start()
+
+    def tearDown(self):
+        for stand_in in (self.slow, self.fast, self.lagging):
+            stand_in.stop()
+
+    def testRoutesToFastestUrl(self):
+        pool = ClientPool([self.slow.url, self.fast.url])
+        account = AccountInfo(account="rJhSM8539zfoQwq7NomvEvt9xSbppf38Ng")
+        self.assertEqual(pool.request(account).result["node"], "fast")
+
+    def testSkipsLaggingUrl(self):
+        pool = ClientPool([self.lagging.url, self.slow.url])
+        account = AccountInfo(account="rJhSM8539zfoQwq7NomvEvt9xSbppf38Ng")
+        self.assertEqual(pool.request(account).result["node"], "slow")
@@ -0,0 +1,98 @@
+from xrplpers.nfts.entities import NFToken, TokenID, TokenIDPredictor
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+import json
+from xrpl.models.transactions import NFTokenMint
+from xrpl.utils import hex_to_str
+
+
+def mint_from_fixture(fixture):
+    """
+    Build the NFTokenMint model NFToken.mint would send for the fixture.
+    """
+    return NFToken.build_mint(
+        SimpleNamespace(classic_address=fixture["Account"]),
+        hex_to_str(fixture["URI"]),
+        creator=SimpleNamespace(classic_address=fixture["Issuer"]),
+        fee=fixture["TransferFee"],
+    )
+
+
+class testTokenIDPredictor(unittest.TestCase):
+    def setUp(self):
+        with Path("test/fixture_submitted_mint_transaction.json").open() as f:
+            self.fixture = json.load(f)
+        self.mint = mint_from_fixture(self.fixture)
+        for n in self.fixture["meta"]["AffectedNodes"]:
+            v = list(n.values())[0]
+            if v["LedgerEntryType"] == "AccountRoot":
+                if v["FinalFields"]["Account"] == self.fixture["Issuer"]:
+                    # The issuer's account as it was before the mint
+                    self.issuer_root = dict(v["FinalFields"], **v["PreviousFields"])
+
+    def testFromMintTxn(self):
+        t = TokenID.from_mint_txn(self.mint, 68)
+        self.assertEqual(t.transfer_fee.value, 25000)
+        self.assertEqual(t.sequence, 68)
+        self.assertEqual(t.issuer_as_string, self.fixture["Issuer"])
+
+    def testPredictMatchesValidatedMint(self):
+        # The fixture predates fixNFTokenRemint
+        predictor = TokenIDPredictor.from_account_root(
+            self.issuer_root, remint_fix=False
+        )
+        predicted = predictor.predict(self.mint)
+        token = NFToken.from_transaction(self.fixture)
+        self.assertEqual(predicted.to_str(), token.id.to_str())
+        self.assertEqual(predictor.reconcile([predicted], [token]), [])
+
+    def testPredictBatch(self):
+        predictor = TokenIDPredictor(self.fixture["Issuer"], 10)
+        ids = predictor.predict_batch([self.mint] * 3)
+        self.assertEqual([t.sequence for t in ids], [10, 11, 12])
+        self.assertEqual(len({t.to_str() for t in ids}), 3)
+        self.assertEqual(predictor.next_sequence, 13)
+
+    def testFromFixtureJson(self):
+        t = TokenID.from_mint_txn(self.fixture, 68)
+        self.assertEqual(t.to_str(), NFToken.from_transaction(self.fixture).id.to_str())
+
+    def testFlagsAsDictAndMasked(self):
+        for flags in [{"tf_transferable": True, "tf_burnable": True}, [8, 1]]:
+            mint = NFTokenMint(
+                account=self.fixture["Account"], nftoken_taxon=0, flags=flags
+            )
+            self.assertEqual(TokenID.from_mint_txn(mint, 0).flags, 9)
+        mint = NFTokenMint(
+            account=self.fixture["Account"], nftoken_taxon=0, flags=0x80000009
+        )
+        self.assertEqual(TokenID.from_mint_txn(mint, 0).flags, 9)
+
+    def testNeverMintedIssuer(self):
+        predictor = TokenIDPredictor.from_account_root(
+            {"Account": self.fixture["Issuer"], "Sequence": 177324}
+        )
+        self.assertEqual(predictor.next_sequence, 177324)
+        predictor = TokenIDPredictor.from_account_root(
+            {"Account": self.fixture["Issuer"], "Sequence": 177324}, remint_fix=False
+        )
+        self.assertEqual(predictor.next_sequence, 0)
+
+    def testFirstNFTokenSequence(self):
+        predictor = TokenIDPredictor.from_account_root(
+            {"Account": "r", "FirstNFTokenSequence": 100, "MintedNFTokens": 5}
+        )
+        self.assertEqual(predictor.next_sequence, 105)
+
+    def testWrongIssuer(self):
+        with self.assertRaises(ValueError):
+            TokenIDPredictor(self.fixture["Account"]).predict(self.mint)
+
+    def testReconcileMismatch(self):
+        predictor = TokenIDPredictor(self.fixture["Issuer"], 60)
+        predicted = predictor.predict(self.mint)
+        token = NFToken.from_transaction(self.fixture)
+        mismatched = predictor.reconcile([predicted], [token])
+        self.assertEqual(mismatched, [(predicted, token.id)])
+        self.assertEqual(predictor.next_sequence, 69)
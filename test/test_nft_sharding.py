@@ -0,0 +1,188 @@
+from xrplpers.nfts.sharding import (
+    Shard,
+    ShardedNFTokenIndex,
+    ShardWorkerError,
+    shard_for,
+)
+from xrplpers.nfts.entities import NFTokenListHelper
+import multiprocessing
+import unittest
+from pathlib import Path
+from unittest import mock
+import json
+import os
+import sys
+import time
+
+
+def synthetic_mints(n):
+    """
+    `n` NFTokenMint transactions as raw JSON, each adding one token to a
+    page holding up to 31 earlier tokens.
+    """
+    issuer = "95F14B0E44F78A264E41713C64B5F89242540EE2"
+    tokens = [
+        f"0008000A{issuer}{(i * 2654435761) % 2**32:08X}{i:08X}" for i in range(n)
+    ]
+
+    def page(token_ids):
+        return {
+            "NonFungibleTokens": [
+                {"NonFungibleToken": {"TokenID": t, "URI": ""}} for t in token_ids
+            ]
+        }
+
+    txns = []
+    for i in range(n):
+        previous = tokens[max(0, i - 31) : i]
+        node = {
+            "LedgerEntryType": "NFTokenPage",
+            "PreviousFields": page(previous),
+            "FinalFields": page(previous + [tokens[i]]),
+        }
+        txns.append(
+            json.dumps(
+                {
+                    "TransactionType": "NFTokenMint",
+                    "meta": {
+                        "TransactionResult": "tesSUCCESS",
+                        "AffectedNodes": [{"ModifiedNode": node}],
+                    },
+                }
+            )
+        )
+    return txns
+
+
+def usable_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class testShardFor(unittest.TestCase):
+    def testStable(self):
+        token = "000B013A95F14B0E44F78A264E41713C64B5F89242540EE2BC8B858E00000D65"
+        self.assertEqual(shard_for(token, 8), shard_for(token, 8))
+        self.assertEqual(shard_for(token, 1), 0)
+
+    def testIgnoresFlagsFeeAndTaxon(self):
+        a = "000B013A95F14B0E44F78A264E41713C64B5F89242540EE2BC8B858E00000D65"
+        b = "0008000095F14B0E44F78A264E41713C64B5F89242540EE20000000000000D65"
+        self.assertEqual(shard_for(a, 16), shard_for(b, 16))
+
+
+class testShardedNFTokenIndex(unittest.TestCase):
+    def setUp(self):
+        with Path("test/fixture_submitted_mint_transaction.json").open() as f:
+            self.fixture = json.load(f)
+        self.index = ShardedNFTokenIndex(shards=3)
+        self.addCleanup(self.index.close)
+
+    def testMatchesListHelper(self):
+        expected = NFTokenListHelper()
+        expected_new, expected_added = expected.add_from_transaction(self.fixture)
+        new, added = self.index.add_from_transaction(self.fixture)
+        self.assertEqual(len(self.index), len(expected))
+        self.assertEqual(new._nfts, expected_new._nfts)
+        self.assertEqual(added._nfts, expected_added._nfts)
+        self.assertEqual(self.index.tokens()._nfts, expected._nfts)
+
+    def testSpreadsAcrossShards(self):
+        self.index.add_from_transaction(self.fixture)
+        self.assertTrue(all(size > 0 for size in self.index.shard_sizes()))
+
+    def testBatchOfTransactions(self):
+        new, added = self.index.add_from_transactions([self.fixture, self.fixture])[1]
+        self.assertEqual(len(new), 1)
+        self.assertEqual(len(added), 0)
+
+    def testQueries(self):
+        self.index.add_from_transaction(self.fixture)
+        issued = self.index.issued_by(self.fixture["Issuer"])
+        self.assertEqual(len(issued), len(self.index))
+        token = issued.pop()
+        self.assertIn(token, self.index)
+        self.assertEqual(
+            self.index.issued_by("rNCFjv8Ek5oDrNiMJ3pw6eLLFtMjZLJnf2"), set()
+        )
+
+    def testAddFromList(self):
+        token = "000B013A95F14B0E44F78A264E41713C64B5F89242540EE2BC8B858E00000D65"
+        self.index.add_from_list([token])
+        self.assertIn(token, self.index)
+        self.assertEqual(len(self.index), 1)
+
+    def testMatchesListHelperAcrossChunks(self):
+        txns = synthetic_mints(200)
+        expected = NFTokenListHelper(["ABC" * 21 + "D"])
+        expected_results = [expected.add_from_transaction(json.loads(t)) for t in txns]
+        with ShardedNFTokenIndex(shards=3, chunk_size=7) as index:
+            index.add_from_list(["ABC" * 21 + "D"])
+            results = index.add_from_transactions(txns)
+            self.assertEqual(index.tokens()._nfts, expected._nfts)
+        for (new, added), (expected_new, expected_added) in zip(
+            results, expected_results
+        ):
+            self.assertEqual(new._nfts, expected_new._nfts)
+            self.assertEqual(added._nfts, expected_added._nfts)
+
+    def testBatchContains(self):
+        self.index.add_from_transaction(self.fixture)
+        tokens = self.index.tokens()._nfts
+        missing = "000B013A95F14B0E44F78A264E41713C64B5F89242540EE2BC8B858E00000D65"
+        self.assertEqual(self.index.contains(tokens | {missing}), tokens)
+
+    def testBadTransaction(self):
+        with self.assertRaises(Exception):
+            self.index.add_from_transactions([{"meta": {}}, self.fixture])
+        # The index keeps working after a failed batch
+        self.index.add_from_transaction(self.fixture)
+        self.assertEqual(len(self.index), 29)
+
+    @unittest.skipUnless(
+        "fork" in multiprocessing.get_all_start_methods(), "needs fork"
+    )
+    def testApplyFailure(self):
+        # Forked workers inherit the patch
+        with mock.patch.object(Shard, "add_from_list", side_effect=RuntimeError):
+            index = ShardedNFTokenIndex(2, multiprocessing.get_context("fork"))
+        with index:
+            with self.assertRaises(RuntimeError):
+                index.add_from_list(["ABC" * 21 + "D"])
+            self.assertEqual(len(index), 0)
+
+    def testDeadWorker(self):
+        self.index._workers[0].terminate()
+        self.index._workers[0].join()
+        with self.assertRaises(ShardWorkerError) as e:
+            self.index.add_from_transaction(self.fixture)
+        self.assertIn(0, e.exception.exitcodes)
+
+
+@unittest.skipUnless(
+    os.environ.get("XRPLPERS_BENCHMARK"), "set XRPLPERS_BENCHMARK=1 to run"
+)
+class testShardingBenchmark(unittest.TestCase):
+    """
+    Times the sharded index against one process and prints the results; run
+    with `XRPLPERS_BENCHMARK=1 python -m pytest -s test/test_nft_sharding.py`.
+    """
+
+    def testTimings(self):
+        txns = synthetic_mints(20000)
+        start = time.perf_counter()
+        expected = NFTokenListHelper()
+        for t in txns:
+            expected.add_from_transaction(json.loads(t))
+        timings = {"single process": time.perf_counter() - start}
+
+        for shards in sorted({1, 2, usable_cpus()}):
+            with ShardedNFTokenIndex(shards=shards) as index:
+                start = time.perf_counter()
+                index.add_from_transactions(txns)
+                timings[f"{shards} shards"] = time.perf_counter() - start
+                self.assertEqual(len(index), len(expected))
+        print(f"\n{len(txns)} transactions on {usable_cpus()} CPUs", file=sys.stderr)
+        for name, seconds in timings.items():
+            print(f"  {name}: {seconds:.2f}s", file=sys.stderr)
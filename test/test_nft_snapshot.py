@@ -0,0 +1,138 @@
+from xrplpers.clients import ClientPool
+from xrplpers.nfts.snapshot import NFTokenSnapshot, key_ranges, _account_int
+from xrplpers.nfts.entities import NFTokenListHelper
+import asyncio
+import bisect
+import unittest
+from xrpl.asyncio.clients.client import Client
+from xrpl.models.response import Response, ResponseStatus
+
+OWNER = "rJhSM8539zfoQwq7NomvEvt9xSbppf38Ng"
+ISSUER = "rNCFjv8Ek5oDrNiMJ3pw6eLLFtMjZLJnf2"
+OTHER = "rawtybaJBgwuUcaNv28Q4YnvqQj1mowz41"
+
+
+def synthetic_token(issuer, taxon, sequence):
+    issuer_hex = _account_int(issuer).to_bytes(20, byteorder="big").hex()
+    return f"0008000A{issuer_hex}{taxon:08X}{sequence:08X}".upper()
+
+
+class MockNode(Client):
+    """
+    Serves `server_info`, `ledger` and `ledger_data` from a sorted set of
+    synthetic NFTokenPages, 32 tokens to a page, surrounded by unrelated
+    entries. Ledgers past `ledger_index` are not found.
+    """
+
+    def __init__(self, owner, tokens, ledger_index=1000, latency=0.0, url="mock"):
+        super().__init__(url)
+        self.ledger_index = ledger_index
+        self.latency = latency
+        self.requests = []
+        base = _account_int(owner) << 96
+        tokens = sorted(tokens, key=lambda t: int(t, 16) & ((1 << 96) - 1))
+        entries = {
+            base - 5: {"LedgerEntryType": "AccountRoot"},
+            base + (1 << 96) + 5: {"LedgerEntryType": "AccountRoot"},
+        }
+        for i in range(0, len(tokens), 32):
+            page = tokens[i : i + 32]
+            key = base + (int(page[-1], 16) & ((1 << 96) - 1))
+            entries[key] = {
+                "LedgerEntryType": "NFTokenPage",
+                "NonFungibleTokens": [
+                    {"NonFungibleToken": {"TokenID": t, "URI": ""}} for t in page
+                ],
+            }
+        self.keys = sorted(entries)
+        self.entries = entries
+
+    async def _request_impl(self, request):
+        await asyncio.sleep(self.latency)
+        self.requests.append(request)
+        if request.method.value == "server_info":
+            result = {
+                "info": {
+                    "server_state": "full",
+                    "validated_ledger": {"seq": self.ledger_index},
+                }
+            }
+        elif request.method.value == "ledger":
+            result = {"ledger_index": self.ledger_index}
+        elif request.ledger_index > self.ledger_index:
+            return Response(
+                status=ResponseStatus.ERROR,
+                result={"error": "lgrNotFound", "status": "error"},
+            )
+        else:
+            start = bisect.bisect_right(self.keys, int(request.marker, 16))
+            keys = self.keys[start : start + request.limit]
+            result = {"state": [dict(self.entries[k], index=f"{k:064X}") for k in keys]}
+            if start + request.limit < len(self.keys):
+                result["marker"] = f"{keys[-1]:064X}"
+        return Response(status=ResponseStatus.SUCCESS, result=result)
+
+
+class testKeyRanges(unittest.TestCase):
+    def testRangesCoverOwnerKeySpace(self):
+        for issuer in [None, ISSUER]:
+            ranges = key_ranges(OWNER, 4, issuer)
+            base = _account_int(OWNER) << 96
+            self.assertEqual(ranges[0][0], base)
+            self.assertEqual(ranges[-1][1], base + (1 << 96) - 1)
+            for (_, hi), (lo, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(hi + 1, lo)
+
+    def testIssuerSplit(self):
+        self.assertEqual(len(key_ranges(OWNER, 4, ISSUER)), 6)
+
+    def testBadParts(self):
+        for parts in [0, -1, (1 << 64) + 1]:
+            with self.assertRaises(ValueError):
+                key_ranges(OWNER, parts, ISSUER)
+
+
+class testNFTokenSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tokens = {
+            synthetic_token(ISSUER, (i * 384160001 + 2459) % 2**32, i)
+            for i in range(500)
+        } | {synthetic_token(OTHER, 0, i) for i in range(20)}
+
+    def testFetchesEveryToken(self):
+        node = MockNode(OWNER, self.tokens)
+        helper = NFTokenSnapshot(node, OWNER, parts=4, limit=3, issuer=ISSUER).fetch()
+        self.assertEqual(len(helper), len(self.tokens))
+        self.assertEqual(helper._nfts, self.tokens)
+
+    def testStreamsIntoExistingHelper(self):
+        node = MockNode(OWNER, self.tokens)
+        helper = NFTokenListHelper(["ABC"])
+        NFTokenSnapshot(node, OWNER, parts=3, limit=5).fetch(helper)
+        self.assertEqual(len(helper), len(self.tokens) + 1)
+
+    def testPinnedLedger(self):
+        node = MockNode(OWNER, self.tokens, ledger_index=77)
+        snapshot = NFTokenSnapshot(node, OWNER, parts=2)
+        snapshot.fetch(ledger_index=77)
+        self.assertEqual(snapshot.ledger_index, 77)
+        self.assertTrue(all(r.method.value == "ledger_data" for r in node.requests))
+
+    def testPoolPinsLedgerEveryNodeHas(self):
+        ahead = MockNode(OWNER, self.tokens, 1001, 0.0, "ahead")
+        behind = MockNode(OWNER, self.tokens, 1000, 0.001, "behind")
+        pool = ClientPool([ahead, behind])
+        snapshot = NFTokenSnapshot(pool, OWNER, parts=4, limit=5)
+        helper = snapshot.fetch()
+        self.assertEqual(snapshot.ledger_index, 1000)
+        self.assertEqual(helper._nfts, self.tokens)
+
+    def testPoolFailsOverWhenLedgerNotFound(self):
+        ahead = MockNode(OWNER, self.tokens, 1001, 0.001, "ahead")
+        behind = MockNode(OWNER, self.tokens, 1000, 0.0, "behind")
+        pool = ClientPool([ahead, behind])
+        helper = NFTokenSnapshot(pool, OWNER, parts=4, limit=5).fetch(ledger_index=1001)
+        self.assertEqual(helper._nfts, self.tokens)
+        # The behind node stays in the pool
+        self.assertEqual(behind.requests[-1].method.value, "ledger_data")
+        self.assertTrue(pool.nodes[1].healthy)
@@ -14,13 +14,9 @@ class testTokenFromHex(unittest.TestCase):
         t = TokenID.from_hex(self.token_hex)
         self.assertEqual(t.sequence, 3429)
 
-    @unittest.skip
     def testTaxon(self):
-        """
-        Skipping until the unscrambling of taxons is understood
-        """
         t = TokenID.from_hex(self.token_hex)
-        self.assertEqual(t.taxon, 146999694)
+        self.assertEqual(t.taxon.value, 146999694)
 
     def testIssuer(self):
         t = TokenID.from_hex(self.token_hex)
@@ -69,7 +65,6 @@ class testTokenFromHex(unittest.TestCase):
         self.assertEqual(t.to_str()[56:64], self.token_hex[56:64])
         self.assertEqual(t.to_str()[56:64], "00000D65")
 
-    @unittest.skip
     def testToStringRoundtrip(self):
         t = TokenID.from_hex(self.token_hex)
         self.assertEqual(t.to_str(), self.token_hex)
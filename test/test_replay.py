@@ -0,0 +1,203 @@
+from xrplpers.replay.cassette import Cassette, NoRecordingError, request_key
+from xrplpers.replay.servers import Faults, HTTPStandIn, WebsocketStandIn
+from xrplpers.replay.load import percentile, run_load
+from xrplpers.xumm.transactions import verify_signature, xumm_login
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import requests
+from xrpl.clients import JsonRpcClient, WebsocketClient
+from xrpl.core.keypairs import generate_seed
+from xrpl.models.requests import ServerInfo
+
+
+def fixture_cassette():
+    fixtures = json.loads(
+        (Path(__file__).parent / Path("fixture_verification.json")).read_text()
+    )
+    cassette = Cassette()
+    cassette.record(
+        request_key("POST", "/platform/payload"),
+        {},
+        {"status": 200, "body": {"uuid": "u1", "next": {}}},
+    )
+    cassette.record(
+        request_key("GET", "/platform/payload/u1"),
+        {},
+        {
+            "status": 200,
+            "body": {
+                "response": {
+                    "hex": fixtures["valid"]["blob"],
+                    "account": fixtures["valid"]["account"],
+                }
+            },
+        },
+    )
+    cassette.record(
+        request_key("POST", "/", {"method": "server_info"}),
+        {},
+        {
+            "status": 200,
+            "body": {"result": {"status": "success", "info": {"build_version": "1"}}},
+        },
+    )
+    return cassette
+
+
+def mint_cassette():
+    """
+    The rippled calls NFToken.mint makes, answered with the submitted mint
+    fixture.
+    """
+    fixture = json.loads(
+        (
+            Path(__file__).parent / Path("fixture_submitted_mint_transaction.json")
+        ).read_text()
+    )
+    results = {
+        "server_info": {"info": {"build_version": "1.9.4"}},
+        "account_info": {"account_data": {"Sequence": fixture["Sequence"]}},
+        "fee": {
+            "drops": {
+                "base_fee": "10",
+                "open_ledger_fee": "10",
+                "minimum_fee": "10",
+                "median_fee": "5000",
+            },
+            "current_queue_size": "0",
+            "max_queue_size": "100",
+        },
+        "ledger": {"ledger_index": fixture["ledger_index"] - 5},
+        "submit": {"engine_result": "tesSUCCESS", "tx_json": {"hash": fixture["hash"]}},
+        "tx": fixture,
+    }
+    cassette = Cassette()
+    for method, result in results.items():
+        cassette.record(
+            request_key("POST", "/", {"method": method}),
+            {},
+            {"status": 200, "body": {"result": dict(result, status="success")}},
+        )
+    return cassette
+
+
+class testCassette(unittest.TestCase):
+    def testCyclesResponses(self):
+        cassette = Cassette()
+        cassette.record("GET /a", {}, {"status": 200, "body": 1})
+        cassette.record("GET /a", {}, {"status": 200, "body": 2})
+        bodies = [cassette.response_for("GET /a")["body"] for _ in range(3)]
+        self.assertEqual(bodies, [1, 2, 1])
+
+    def testMissingRecording(self):
+        with self.assertRaises(NoRecordingError):
+            Cassette().response_for("GET /a")
+
+    def testSaveLoad(self):
+        path = Path(tempfile.mkdtemp()) / "cassette.json"
+        fixture_cassette().save(path)
+        self.assertEqual(len(Cassette.load(path)), 3)
+
+    def testRippledKey(self):
+        self.assertEqual(request_key("POST", "/", {"method": "tx"}), "rippled tx")
+
+    def testPercentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        # nearest rank for n=150 is ceil(148.5) = 149, the 149th value
+        self.assertEqual(percentile(list(range(1, 151)), 99), 149)
+
+
+class testStandIns(unittest.TestCase):
+    def setUp(self):
+        creds = Path(tempfile.mkdtemp()) / "creds.json"
+        creds.write_text(json.dumps({"x-api-key": "k", "x-api-secret": "s"}))
+        self.env = mock.patch.dict(os.environ, {"XUMM_CREDS_PATH": str(creds)})
+        self.env.start()
+        self.addCleanup(self.env.stop)
+
+    def use(self, stand_in):
+        stand_in.start()
+        self.addCleanup(stand_in.stop)
+        os.environ["XUMM_API_URL"] = stand_in.url
+        return stand_in
+
+    def testReplayVerify(self):
+        self.use(HTTPStandIn(fixture_cassette()))
+        payload = xumm_login()
+        account = verify_signature(
+            {"payloadResponse": {"payload_uuidv4": payload["uuid"]}}
+        )
+        self.assertEqual(account, "rwiETSee2wMz3SBnAG8hkMsCgvGy9LWbZ1")
+
+    def testInjectedErrors(self):
+        self.use(HTTPStandIn(fixture_cassette(), Faults(error_rate=1)))
+        with self.assertRaises(requests.HTTPError):
+            xumm_login()
+
+    def testInjectedLatency(self):
+        self.use(HTTPStandIn(fixture_cassette(), Faults(latency=0.05)))
+        report = run_load("verify", total=4, concurrency=2)
+        self.assertEqual(report.errors, 0)
+        self.assertGreaterEqual(report.p50, 0.1)
+
+    def testThroughputCap(self):
+        self.use(HTTPStandIn(fixture_cassette(), Faults(max_rps=20)))
+        report = run_load("login", total=10, concurrency=10)
+        self.assertGreaterEqual(report.duration, 0.4)
+        self.assertLessEqual(report.throughput, 25)
+
+    def testRecordThroughProxy(self):
+        upstream = HTTPStandIn(fixture_cassette()).start()
+        self.addCleanup(upstream.stop)
+        recorded = Cassette()
+        self.use(HTTPStandIn(recorded, upstream=upstream.url))
+        xumm_login()
+        self.assertEqual(len(recorded), 1)
+        self.assertEqual(recorded.interactions[0]["key"], "POST /platform/payload")
+        self.assertNotIn("headers", recorded.interactions[0]["request"])
+
+    def testJsonRpcReplay(self):
+        stand_in = self.use(HTTPStandIn(fixture_cassette()))
+        response = JsonRpcClient(stand_in.url).request(ServerInfo())
+        self.assertTrue(response.is_successful())
+        self.assertEqual(response.result["info"]["build_version"], "1")
+
+    def testWebsocketReplay(self):
+        stand_in = self.use(WebsocketStandIn(fixture_cassette()))
+        with WebsocketClient(stand_in.url) as client:
+            response = client.request(ServerInfo())
+        self.assertTrue(response.is_successful())
+        self.assertEqual(response.result["info"]["build_version"], "1")
+
+    def testWebsocketTooBusy(self):
+        stand_in = self.use(WebsocketStandIn(fixture_cassette(), Faults(error_rate=1)))
+        with WebsocketClient(stand_in.url) as client:
+            response = client.request(ServerInfo())
+        self.assertEqual(response.result["error"], "tooBusy")
+
+    def testMintFlow(self):
+        stand_in = self.use(HTTPStandIn(mint_cassette()))
+        report = run_load(
+            "mint",
+            total=2,
+            concurrency=2,
+            seed=generate_seed(),
+            uri="https://nft.audiotarky.com/a_long_hash",
+            rippled_url=stand_in.url,
+        )
+        self.assertEqual(dict(report.error_types), {})
+        self.assertEqual(len(report.latencies), 2)
+
+    def testErrorsReportedByType(self):
+        stand_in = self.use(HTTPStandIn(mint_cassette()))
+        report = run_load("mint", total=3, concurrency=3, rippled_url=stand_in.url)
+        self.assertEqual(report.errors, 3)
+        (error,) = report.error_types
+        self.assertTrue(error.startswith("ValueError"))
+        self.assertIn(error, str(report))
@@ -0,0 +1,226 @@
+"""
+A pool of rippled clients that can be passed anywhere a single xrpl-py client
+is expected (e.g. `NFToken.mint`).
+
+- reads go to the lowest latency node that is in sync with the rest of the pool
+- submissions are pinned to the node that accepted them until the `tx` lookup
+  for that hash comes back validated
+- a node that errors or falls behind is skipped and the request is retried on
+  the next best node
+"""
+
+import asyncio
+from dataclasses import dataclass
+import threading
+import time
+import typing
+from xrpl.asyncio.clients.client import Client
+from xrpl.clients import JsonRpcClient
+from xrpl.clients.sync_client import SyncClient
+from xrpl.models.requests import ServerInfo
+from xrpl.models.requests.request import RequestMethod
+from xrpl.models.response import Response
+
+# Server states where the node is tracking the network and can answer reads
+SYNCED_STATES = {"full", "proposing", "validating"}
+# Errors that mean the node, rather than the request, is the problem
+NODE_ERRORS = {"noNetwork", "noCurrent", "noClosed", "tooBusy", "notSynced"}
+# Errors that mean this node lacks data another node may still have
+FAILOVER_ERRORS = {"lgrNotFound"}
+SUBMIT_METHODS = {RequestMethod.SUBMIT, RequestMethod.SUBMIT_MULTISIGNED}
+# Preliminary results that may still lead to the transaction validating
+PROVISIONAL_RESULTS = ("tes", "ter")
+
+
+class NoHealthyNodeError(Exception):
+    def __init__(self, errors=None, *args, **kwargs):
+        super().__init__(args, kwargs)
+        self.errors = errors or {}
+
+
+@dataclass
+class Node:
+    client: Client
+    latency: float = float("inf")
+    validated_ledger: int = 0
+    server_state: str = ""
+    healthy: bool = False
+
+    @property
+    def url(self):
+        return self.client.url
+
+
+@dataclass
+class Pin:
+    node: Node
+    last_ledger_sequence: typing.Optional[int]
+    pinned_at: float
+
+
+class ClientPool(SyncClient):
+    """
+    Health checks a set of nodes and routes requests between them.
+
+    Nodes are given as urls (wrapped in a `JsonRpcClient`) or as existing
+    clients. The first request checks every node; after that, once the
+    ranking is more than `check_interval` seconds old, it is refreshed in a
+    background thread while requests are served from the last one. A node
+    that doesn't answer `server_info` within `health_timeout` seconds is
+    unhealthy, and a node is considered in sync if its validated ledger is no
+    more than `max_ledger_lag` behind the most advanced node in the pool.
+
+    A submission is unpinned once it validates, once the pool has seen a
+    validated ledger past its LastLedgerSequence, or after `pin_ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        nodes,
+        check_interval=10,
+        max_ledger_lag=2,
+        pin_ttl=300,
+        health_timeout=2,
+    ) -> None:
+        if not nodes:
+            raise ValueError("ClientPool needs at least one node")
+        self.nodes = [
+            Node(JsonRpcClient(n) if isinstance(n, str) else n) for n in nodes
+        ]
+        self.check_interval = check_interval
+        self.max_ledger_lag = max_ledger_lag
+        self.pin_ttl = pin_ttl
+        self.health_timeout = health_timeout
+        self.last_check = 0.0
+        self._refresh: typing.Optional[threading.Thread] = None
+        # transaction hash -> Pin for the node that accepted the submission
+        self.pinned: typing.Dict[str, Pin] = {}
+        super().__init__(self.nodes[0].url)
+
+    async def _check_node(self, node):
+        start = time.monotonic()
+        try:
+            response = await asyncio.wait_for(
+                node.client._request_impl(ServerInfo()), self.health_timeout
+            )
+        except Exception:
+            node.healthy = False
+            return
+        node.latency = time.monotonic() - start
+        if not response.is_successful():
+            node.healthy = False
+            return
+        info = response.result["info"]
+        node.server_state = info.get("server_state", "")
+        node.validated_ledger = info.get("validated_ledger", {}).get("seq", 0)
+        node.healthy = node.server_state in SYNCED_STATES
+
+    async def check_health(self):
+        """
+        Query `server_info` on every node concurrently and mark any that time
+        out, are not synced, or lag the best validated ledger, as unhealthy.
+        """
+        await asyncio.gather(*[self._check_node(n) for n in self.nodes])
+        self.last_check = time.monotonic()
+        best = max(n.validated_ledger for n in self.nodes)
+        for n in self.nodes:
+            if best - n.validated_ledger > self.max_ledger_lag:
+                n.healthy = False
+        self.expire_pins(best)
+
+    def expire_pins(self, validated_ledger=0):
+        """
+        Drop pins for submissions that can no longer validate, or that are
+        older than `pin_ttl`.
+        """
+        now = time.monotonic()
+        for txn_hash, pin in list(self.pinned.items()):
+            expired = pin.last_ledger_sequence is not None and (
+                validated_ledger > pin.last_ledger_sequence
+            )
+            if expired or now - pin.pinned_at > self.pin_ttl:
+                self.pinned.pop(txn_hash, None)
+
+    def refresh_in_background(self):
+        """
+        Run `check_health` in a thread, unless a refresh is already running.
+        """
+        if self._refresh and self._refresh.is_alive():
+            return
+        self._refresh = threading.Thread(
+            target=lambda: asyncio.run(self.check_health()), daemon=True
+        )
+        self._refresh.start()
+
+    async def common_ledger(self) -> int:
+        """
+        The newest validated ledger that every healthy node has, to pin reads
+        that must see the same ledger whichever node answers them.
+        """
+        if not self.last_check:
+            await self.check_health()
+        ledgers = [n.validated_ledger for n in self.nodes if n.healthy]
+        if not ledgers:
+            raise NoHealthyNodeError()
+        return min(ledgers)
+
+    def ranked(self) -> typing.List[Node]:
+        """
+        Healthy nodes ordered by latency, followed by the unhealthy ones as a
+        last resort.
+        """
+        by_latency = sorted(self.nodes, key=lambda n: n.latency)
+        return [n for n in by_latency if n.healthy] + [
+            n for n in by_latency if not n.healthy
+        ]
+
+    def _candidates(self, request) -> typing.List[Node]:
+        ranked = self.ranked()
+        txn_hash = getattr(request, "transaction", None)
+        if request.method == RequestMethod.TX and txn_hash in self.pinned:
+            pinned = self.pinned[txn_hash].node
+            return [pinned] + [n for n in ranked if n is not pinned]
+        return ranked
+
+    def _track_submission(self, request, response, node):
+        if request.method in SUBMIT_METHODS and response.is_successful():
+            engine_result = response.result.get("engine_result", "")
+            tx_json = response.result.get("tx_json", {})
+            if tx_json.get("hash") and engine_result.startswith(PROVISIONAL_RESULTS):
+                self.pinned[tx_json["hash"]] = Pin(
+                    node, tx_json.get("LastLedgerSequence"), time.monotonic()
+                )
+        elif request.method == RequestMethod.TX and response.is_successful():
+            if response.result.get("validated"):
+                self.pinned.pop(response.result.get("hash"), None)
+
+    async def _request_impl(self, request) -> Response:
+        if not self.last_check:
+            # Nothing to rank by yet
+            await self.check_health()
+        elif time.monotonic() - self.last_check > self.check_interval:
+            self.refresh_in_background()
+        errors = {}
+        missing = None
+        for node in self._candidates(request):
+            try:
+                response = await node.client._request_impl(request)
+            except Exception as e:
+                node.healthy = False
+                errors[node.url] = e
+                continue
+            error = None if response.is_successful() else response.result.get("error")
+            if error in NODE_ERRORS:
+                node.healthy = False
+                errors[node.url] = error
+                continue
+            if error in FAILOVER_ERRORS:
+                # Healthy, just behind or missing history; try the next node
+                missing = missing or response
+                errors[node.url] = error
+                continue
+            self._track_submission(request, response, node)
+            return response
+        if missing:
+            return missing
+        raise NoHealthyNodeError(errors)
@@ -9,12 +9,12 @@ objects and one new ledger structure:
   owned by the same account.
 """
 
-
 from dataclasses import dataclass
 from enum import IntFlag
 from struct import Struct, pack
 import typing
 from xrpl.core.binarycodec.types.account_id import AccountID
+from xrpl.models.requests import AccountInfo
 from xrpl.models.transactions import (
     Memo,
     NFTokenMint,
@@ -69,12 +69,14 @@ class TransferFee:
 
 class Taxon:
     """
-    f(x)=(m*x+c) mod n
+    The taxon is stored in the TokenID XOR'd with f(x)=(m*x+c) mod n, where x
+    is the token sequence, so that tokens sharing a taxon don't sit together
+    in the same NFTokenPage.
     """
 
     m = 384160001
     c = 2459
-    n = 200
+    n = 2**32
     value = 0
 
     def __init__(self, value: int) -> None:
@@ -82,7 +84,14 @@ class Taxon:
 
     @classmethod
     def scramble(cls, sequence):
-        return (cls.m * sequence + cls.c) % n
+        return (cls.m * sequence + cls.c) % cls.n
+
+    def ciphered(self, sequence):
+        """
+        Scramble (or unscramble, the XOR is its own inverse) the taxon for the
+        token with the given sequence.
+        """
+        return Taxon(self.value ^ self.scramble(sequence))
 
     @classmethod
     def from_bytes(cls, taxon_bytes):
@@ -134,18 +143,24 @@ class TokenID:
         """
         token_bytes = bytes.fromhex(token_hex)
         flags, transfer_fee, issuer, taxon, sequence = cls.struct.unpack(token_bytes)
+        sequence = int.from_bytes(sequence, byteorder="big")
 
         return cls(
             TokenFlags(int.from_bytes(flags, byteorder="big")),
             TransferFee(int.from_bytes(transfer_fee, byteorder="big")),
             AccountID.from_value(issuer.hex().upper()),
-            Taxon.from_bytes(taxon),
-            int.from_bytes(sequence, byteorder="big"),
+            Taxon.from_bytes(taxon).ciphered(sequence),
+            sequence,
         )
 
     @classmethod
-    def from_mint_txn(cls, mint):
+    def from_mint_txn(cls, mint, sequence):
         """
+        Build the TokenID a mint will produce. `mint` is an NFTokenMint model
+        or its XRPL JSON form, and `sequence` is the token sequence, which
+        comes from the issuer's MintedNFTokens counter (see TokenIDPredictor)
+        rather than the sequence of the transaction.
+
         NFTokenMint(
             account='rawtybaJBgwuUcaNv28Q4YnvqQj1mowz41',
             transaction_type=<TransactionType.NFTOKEN_MINT: 'NFTokenMint'>,
@@ -168,12 +183,16 @@ class TokenID:
         )
 
         """
+        fields = _mint_fields(mint)
+        # Early NFT devnets called the taxon TokenTaxon
+        taxon = fields.get("NFTokenTaxon", fields.get("TokenTaxon", 0))
         return cls(
-            TokenFlags(mint.flags),
-            TransferFee(int(mint.fee)),
-            AccountID.from_value(mint.account),
-            Taxon(mint.token_taxon),
-            mint.sequence,
+            # Only the low 16 bits of the mint's flags are carried into the token
+            TokenFlags(fields.get("Flags", 0) & 0xFFFF),
+            TransferFee(fields.get("TransferFee", 0)),
+            AccountID.from_value(_mint_issuer(fields)),
+            Taxon(taxon),
+            sequence,
         )
 
     def to_str(self) -> str:
@@ -184,7 +203,7 @@ class TokenID:
             self.flags.to_bytes(2, byteorder="big"),
             self.transfer_fee.to_bytes(),
             self.issuer.__bytes__(),
-            self.taxon.as_bytes,
+            self.taxon.ciphered(self.sequence).as_bytes,
             self.sequence.to_bytes(4, byteorder="big"),
         )
         return s.hex().upper()
@@ -200,16 +219,121 @@ class TokenID:
     def as_dict(self):
         return {
             flags: self.flags,
-            transfer_fee:  self.transfer_fee,
+            transfer_fee: self.transfer_fee,
             issuer: self.issuer,
             taxon: self.taxon,
-            sequence: self.sequence
+            sequence: self.sequence,
         }
 
+
+def _mint_fields(mint):
+    return mint.to_xrpl() if hasattr(mint, "to_xrpl") else mint
+
+
+def _mint_issuer(fields):
+    return fields.get("Issuer") or fields["Account"]
+
+
+class TokenIDPredictor:
+    """
+    Work out the TokenIDs a batch of NFTokenMint transactions will produce
+    before they are submitted.
+
+    Tokens are numbered from the issuer's MintedNFTokens counter offset by
+    FirstNFTokenSequence. With the fixNFTokenRemint amendment rippled sets
+    FirstNFTokenSequence to the issuer's account Sequence on its first mint,
+    so that is used when the field is missing; pass `remint_fix=False` for
+    networks without the amendment, where tokens count from 0.
+
+    Predictions hold only if the mints validate in the order they were
+    predicted and nothing else mints for the issuer in the meantime. Call
+    `reconcile` once they have.
+    """
+
+    def __init__(self, issuer: str, next_sequence: int = 0) -> None:
+        self.issuer = issuer
+        self.next_sequence = next_sequence
+
+    @classmethod
+    def from_account_root(cls, account_root, remint_fix=True):
+        # Early NFT devnets called the counter MintedTokens
+        minted = account_root.get("MintedNFTokens", account_root.get("MintedTokens", 0))
+        if "FirstNFTokenSequence" in account_root:
+            first = account_root["FirstNFTokenSequence"]
+        else:
+            first = account_root["Sequence"] if remint_fix else 0
+        return cls(account_root["Account"], first + minted)
+
+    @classmethod
+    def from_ledger(cls, issuer, client, ledger_index="validated", remint_fix=True):
+        response = client.request(
+            AccountInfo(account=issuer, ledger_index=ledger_index)
+        )
+        if not response.is_successful():
+            raise ValueError(f"Could not load account {issuer}: {response.result}")
+        return cls.from_account_root(response.result["account_data"], remint_fix)
+
+    def predict(self, mint) -> TokenID:
+        """
+        Predict the TokenID for the next mint and advance the counter.
+        """
+        if _mint_issuer(_mint_fields(mint)) != self.issuer:
+            raise ValueError(f"Mint is not for issuer {self.issuer}")
+        token_id = TokenID.from_mint_txn(mint, self.next_sequence)
+        self.next_sequence += 1
+        return token_id
+
+    def predict_batch(self, mints) -> typing.List[TokenID]:
+        return [self.predict(m) for m in mints]
+
+    def reconcile(self, predicted, tokens):
+        """
+        Compare predicted TokenIDs with the NFTokens actually minted, returning
+        the (predicted, actual) pairs that differ, and move the counter on to
+        follow the last minted token.
+        """
+        mismatched = [
+            (p, t.id) for p, t in zip(predicted, tokens) if p.to_str() != t.id.to_str()
+        ]
+        if tokens:
+            self.next_sequence = max(t.id.sequence for t in tokens) + 1
+        return mismatched
+
+
 def _flatten_nft_node(node):
     return [x["NonFungibleToken"]["TokenID"] for x in node]
 
 
+def _nft_page_changes(txn):
+    """
+    Return the sets of TokenIDs in the NFTokenPages a transaction touched,
+    before and after it was applied.
+    """
+    before = set()
+    after = set()
+
+    for n in txn["meta"]["AffectedNodes"]:
+        # Cast the dict values view to a list so we can easily get the single entry
+        v = list(n.values())[0]
+        if v["LedgerEntryType"] == "NFTokenPage":
+            try:
+                if "PreviousFields" in v:
+                    before = (
+                        set(_flatten_nft_node(v["PreviousFields"]["NonFungibleTokens"]))
+                        | before
+                    )
+                if "FinalFields" in v:
+                    after = (
+                        set(_flatten_nft_node(v["FinalFields"]["NonFungibleTokens"]))
+                        | after
+                    )
+            except:
+                raise BadTransactionError(
+                    "Could not parse expected transaction fields", transaction=txn
+                )
+    return before, after
+
+
 class BadTransactionError(Exception):
     def __init__(self, transaction=None, *args, **kwargs):
         # Call the base class constructor with the parameters it needs
@@ -230,9 +354,10 @@ class NFToken:
         pass
 
     @classmethod
-    def mint(cls, minter, url, client, creator=None, message="", fee=0):
+    def build_mint(cls, minter, url, creator=None, message="", fee=0):
         """
-        NFTs are created using the NFTokenMint transaction
+        Build the NFTokenMint transaction that `mint` submits, e.g. to pass to
+        TokenIDPredictor before submitting it.
         """
 
         kwargs = {
@@ -240,7 +365,7 @@ class NFToken:
             "flags": 8,
             "uri": str_to_hex(url),
             "transfer_fee": fee,
-            "token_taxon": 0,
+            "nftoken_taxon": 0,
         }
         if creator and minter.classic_address != creator.classic_address:
             kwargs["issuer"] = creator.classic_address
@@ -252,6 +377,16 @@ class NFToken:
 
         nft = NFTokenMint(**kwargs)
         nft.validate()
+        return nft
+
+    @classmethod
+    def mint(cls, minter, url, client, creator=None, message="", fee=0):
+        """
+        NFTs are created using the NFTokenMint transaction
+
+        `client` can be a single xrpl-py client or a `xrplpers.clients.ClientPool`
+        """
+        nft = cls.build_mint(minter, url, creator, message, fee)
         tx_signed = safe_sign_and_autofill_transaction(nft, minter, client)
         nft_tx = send_reliable_submission(tx_signed, client)
 
@@ -267,33 +402,7 @@ class NFToken:
             raise BadTransactionError("Transaction is not an NFTokenMint", txn)
         if txn["meta"]["TransactionResult"] != "tesSUCCESS":
             raise BadTransactionError("Transaction was not successful", txn)
-        nft_id = ""
-        before = set()
-        after = set()
-        for n in txn["meta"]["AffectedNodes"]:
-            v = list(n.values())[0]
-            if v["LedgerEntryType"] == "NFTokenPage":
-                try:
-                    if "PreviousFields" in v:
-                        before = (
-                            set(
-                                _flatten_nft_node(
-                                    v["PreviousFields"]["NonFungibleTokens"]
-                                )
-                            )
-                            | before
-                        )
-                    if "FinalFields" in v:
-                        after = (
-                            set(
-                                _flatten_nft_node(v["FinalFields"]["NonFungibleTokens"])
-                            )
-                            | after
-                        )
-                except:
-                    raise BadTransactionError(
-                        "Could not parse expected transaction fields", transaction=txn
-                    )
+        before, after = _nft_page_changes(txn)
         nft_id = (after - before).pop()
         return cls(
             TokenID.from_hex(nft_id),
@@ -345,35 +454,14 @@ class NFTokenListHelper:
         NFTokenListHelper and return the NFTs that have been added in the
         transaction, and that are new to the listto the list.
         """
-        before = set()
-        after = set()
-
-        for n in txn["meta"]["AffectedNodes"]:
-            # Cast the dict values view to a list so we can easily get the single entry
-            v = list(n.values())[0]
-            if v["LedgerEntryType"] == "NFTokenPage":
-                try:
-                    if "PreviousFields" in v:
-                        before = (
-                            set(
-                                _flatten_nft_node(
-                                    v["PreviousFields"]["NonFungibleTokens"]
-                                )
-                            )
-                            | before
-                        )
-                    if "FinalFields" in v:
-                        after = (
-                            set(
-                                _flatten_nft_node(v["FinalFields"]["NonFungibleTokens"])
-                            )
-                            | after
-                        )
-                except:
-                    raise BadTransactionError(
-                        "Could not parse expected transaction fields", transaction=txn
-                    )
+        before, after = _nft_page_changes(txn)
+        return self.add_from_changes(before, after)
 
+    def add_from_changes(self, before, after):
+        """
+        Add the TokenIDs from the before and after states of a transaction's
+        NFTokenPages, see add_from_transaction.
+        """
         new_nft_in_txn = NFTokenListHelper(after - before)
         new_to_list = NFTokenListHelper((before | after) - self._nfts)
 
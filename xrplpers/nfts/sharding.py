@@ -0,0 +1,337 @@
+"""
+Spread an NFT index across worker processes.
+
+TokenIDs are assigned to a shard by a stable hash of their issuer and
+sequence bytes, so the same token always lands on the same shard regardless
+of process or platform. Each shard runs in its own process and owns an
+NFTokenListHelper plus an issuer index.
+
+The parent does no per-token work. Transactions (ideally still as raw JSON
+text) are cut into chunks and handed round-robin to the workers, which parse
+them, split the NFTokenPage changes by shard and pass each piece straight to
+the worker that owns it. Owners apply pieces in chunk order, so results
+match feeding the same transactions through one NFTokenListHelper.
+"""
+
+from collections import defaultdict
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import typing
+from xrpl.core.binarycodec.types.account_id import AccountID
+from xrplpers.nfts.entities import NFTokenListHelper, _nft_page_changes
+
+# Seconds between checks that the workers are alive while waiting on results
+LIVENESS_INTERVAL = 1.0
+
+
+class ShardWorkerError(Exception):
+    def __init__(self, exitcodes=None, *args, **kwargs):
+        super().__init__(args, kwargs)
+        self.exitcodes = exitcodes or {}
+
+
+def shard_key(token_hex: str) -> bytes:
+    """
+    The issuer (bytes 4-24) and sequence (bytes 28-32) of a TokenID.
+    """
+    token_bytes = bytes.fromhex(token_hex)
+    return token_bytes[4:24] + token_bytes[28:32]
+
+
+def shard_for(token_hex: str, shards: int) -> int:
+    digest = hashlib.blake2b(shard_key(token_hex), digest_size=8).digest()
+    return int.from_bytes(digest, byteorder="big") % shards
+
+
+def _issuer_hex(token_hex: str) -> str:
+    return token_hex[8:48].upper()
+
+
+class Shard:
+    """
+    The state held by one worker: its tokens and an index of them by issuer.
+    """
+
+    def __init__(self) -> None:
+        self.nfts = NFTokenListHelper()
+        self.by_issuer: typing.Dict[str, set] = defaultdict(set)
+
+    def _index(self, token_ids):
+        for t in token_ids:
+            self.by_issuer[_issuer_hex(t)].add(t)
+
+    def add_from_list(self, token_ids):
+        self.nfts.add_from_list(token_ids)
+        self._index(token_ids)
+        return len(self.nfts)
+
+    def add_from_chunk(self, first_seen, in_txn):
+        """
+        Apply a chunk of transactions, given as the TokenIDs each position
+        touched first (`first_seen`) and the TokenIDs each position added
+        (`in_txn`). Returns (position, new in transaction, new to the list)
+        for each position that has any, matching what add_from_transaction
+        on each transaction in turn would give.
+        """
+        to_list = {}
+        for i, token_ids in first_seen.items():
+            new = token_ids - self.nfts._nfts
+            if new:
+                to_list[i] = new
+        for token_ids in first_seen.values():
+            self.add_from_list(token_ids)
+        return [
+            (i, in_txn.get(i, set()), to_list.get(i, set()))
+            for i in sorted(set(in_txn) | set(to_list))
+        ]
+
+    def issued_by(self, issuer_hex):
+        return set(self.by_issuer.get(issuer_hex, ()))
+
+    def contains(self, token_ids):
+        return {t for t in token_ids if t in self.nfts._nfts}
+
+    def tokens(self):
+        return set(self.nfts._nfts)
+
+    def count(self):
+        return len(self.nfts)
+
+
+def _split_chunk(kind, payload, shards):
+    """
+    Parse a chunk and split it into one piece per shard.
+    """
+    if kind == "ids":
+        pieces = [set() for _ in range(shards)]
+        for t in payload:
+            pieces[shard_for(t, shards)].add(t)
+        return pieces
+    # A page's tokens reappear in every transaction touching the page, so
+    # each TokenID is hashed and sent once per chunk, at its first position.
+    start, txns = payload
+    pieces = [({}, {}) for _ in range(shards)]
+    seen = set()
+    for i, txn in enumerate(txns, start):
+        if isinstance(txn, (str, bytes)):
+            txn = json.loads(txn)
+        before, after = _nft_page_changes(txn)
+        for t in (before | after) - seen:
+            pieces[shard_for(t, shards)][0].setdefault(i, set()).add(t)
+        seen |= before | after
+        for t in after - before:
+            pieces[shard_for(t, shards)][1].setdefault(i, set()).add(t)
+    return pieces
+
+
+def _shard_worker(index, inboxes, results):
+    shard = Shard()
+    shards = len(inboxes)
+    inbox = inboxes[index]
+    # Pieces are applied strictly in chunk order
+    next_chunk = 0
+    pending = {}
+    while True:
+        message = inbox.get()
+        if message is None:
+            break
+        command = message[0]
+        if command == "parse":
+            _, chunk, kind, payload = message
+            try:
+                pieces = _split_chunk(kind, payload, shards)
+            except Exception as e:
+                # Every owner reports the failure, keeping the chunk order intact
+                pieces = [e] * shards
+            for s, piece in enumerate(pieces):
+                inboxes[s].put(("apply", chunk, kind, piece))
+        elif command == "apply":
+            _, chunk, kind, piece = message
+            pending[chunk] = (kind, piece)
+            while next_chunk in pending:
+                kind, piece = pending.pop(next_chunk)
+                try:
+                    if isinstance(piece, Exception):
+                        output = piece
+                    elif kind == "ids":
+                        output = shard.add_from_list(piece)
+                    else:
+                        output = shard.add_from_chunk(*piece)
+                except Exception as e:
+                    output = e
+                results.put(("applied", next_chunk, index, output))
+                next_chunk += 1
+        else:
+            _, name, args = message
+            try:
+                results.put(("query", index, True, getattr(shard, name)(*args)))
+            except Exception as e:
+                results.put(("query", index, False, e))
+
+
+class ShardedNFTokenIndex:
+    """
+    An NFTokenListHelper-like index split over `shards` worker processes
+    (defaulting to one per CPU). Use as a context manager, or call `close`,
+    so the workers are shut down.
+    """
+
+    def __init__(self, shards: int = None, context=None, chunk_size=500) -> None:
+        self.shards = shards or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        context = context or multiprocessing.get_context()
+        self._inboxes = [context.Queue() for _ in range(self.shards)]
+        self._results = context.Queue()
+        self._chunk = 0
+        self._workers = []
+        for i in range(self.shards):
+            worker = context.Process(
+                target=_shard_worker,
+                args=(i, self._inboxes, self._results),
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _result(self):
+        """
+        The next message from the workers, raising ShardWorkerError rather
+        than waiting forever if any of them has died.
+        """
+        while True:
+            try:
+                return self._results.get(timeout=LIVENESS_INTERVAL)
+            except queue.Empty:
+                dead = {
+                    i: w.exitcode
+                    for i, w in enumerate(self._workers)
+                    if not w.is_alive()
+                }
+                if dead:
+                    raise ShardWorkerError(dead)
+
+    def _feed(self, kind, chunks) -> typing.List[list]:
+        """
+        Hand chunks to the workers round-robin to parse and route, then wait
+        for every shard to apply them. Returns the outputs of each chunk.
+        """
+        first = self._chunk
+        for n, payload in enumerate(chunks):
+            chunk = first + n
+            self._inboxes[chunk % self.shards].put(("parse", chunk, kind, payload))
+        self._chunk += len(chunks)
+        outputs = [[] for _ in chunks]
+        errors = []
+        for _ in range(len(chunks) * self.shards):
+            _, chunk, _, output = self._result()
+            if isinstance(output, Exception):
+                errors.append(output)
+            else:
+                outputs[chunk - first].append(output)
+        if errors:
+            raise errors[0]
+        return outputs
+
+    def _query(self, commands: typing.Dict[int, typing.Tuple[str, tuple]]) -> list:
+        for shard, (name, args) in commands.items():
+            self._inboxes[shard].put(("query", name, args))
+        results = []
+        errors = []
+        for _ in commands:
+            _, _, ok, result = self._result()
+            if ok:
+                results.append(result)
+            else:
+                errors.append(result)
+        if errors:
+            raise errors[0]
+        return results
+
+    def _broadcast(self, name, *args) -> list:
+        return self._query({i: (name, args) for i in range(self.shards)})
+
+    def add_from_list(self, token_ids):
+        """
+        Add a series of TokenIDs, each to its own shard.
+        """
+        token_ids = list(token_ids)
+        size = self.chunk_size
+        self._feed(
+            "ids", [token_ids[i : i + size] for i in range(0, len(token_ids), size)]
+        )
+
+    def add_from_transactions(self, txns):
+        """
+        Apply a batch of transactions, given as dicts or raw JSON text,
+        returning the (new in transaction, new to the index) pair of
+        NFTokenListHelpers for each, as NFTokenListHelper.add_from_transaction
+        does. Raw JSON is cheaper to hand to the workers than dicts.
+        """
+        txns = list(txns)
+        size = self.chunk_size
+        chunks = [(i, txns[i : i + size]) for i in range(0, len(txns), size)]
+        new_in_txn = [set() for _ in txns]
+        new_to_list = [set() for _ in txns]
+        for outputs in self._feed("txns", chunks):
+            for output in outputs:
+                for i, in_txn, to_list in output:
+                    new_in_txn[i] |= in_txn
+                    new_to_list[i] |= to_list
+        return [
+            (NFTokenListHelper(a), NFTokenListHelper(b))
+            for a, b in zip(new_in_txn, new_to_list)
+        ]
+
+    def add_from_transaction(self, txn):
+        return self.add_from_transactions([txn])[0]
+
+    def issued_by(self, issuer) -> set:
+        """
+        All TokenIDs in the index issued by the given classic address.
+        """
+        issuer_hex = AccountID.from_value(issuer).to_hex()
+        return set().union(*self._broadcast("issued_by", issuer_hex))
+
+    def contains(self, token_ids) -> set:
+        """
+        The subset of `token_ids` in the index, in one round trip per shard.
+        """
+        split = defaultdict(set)
+        for t in token_ids:
+            split[shard_for(t, self.shards)].add(t)
+        commands = {s: ("contains", (ids,)) for s, ids in split.items()}
+        return set().union(*self._query(commands))
+
+    def __contains__(self, token_id):
+        return bool(self.contains([token_id]))
+
+    def tokens(self) -> NFTokenListHelper:
+        return NFTokenListHelper(set().union(*self._broadcast("tokens")))
+
+    def shard_sizes(self) -> typing.List[int]:
+        """
+        Token counts per shard, in no particular order.
+        """
+        return self._broadcast("count")
+
+    def __len__(self):
+        return sum(self.shard_sizes())
+
+    def close(self):
+        for inbox in self._inboxes:
+            inbox.put(None)
+        for worker in self._workers:
+            worker.join()
+        for queue in self._inboxes + [self._results]:
+            queue.close()
+        self._inboxes = []
+        self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,129 @@
+"""
+Fetch every NFToken held by an account by reading its NFTokenPages directly.
+
+An NFTokenPage is keyed by the owner's 160-bit AccountID followed by the low
+96 bits of the TokenIDs it holds, so an account's pages sit in one contiguous
+run of ledger keys. That run can be split into ranges and each range walked
+with `ledger_data` concurrently, all pinned to the same ledger index so the
+snapshot is consistent.
+"""
+
+import asyncio
+import typing
+from xrpl.core.binarycodec.types.account_id import AccountID
+from xrpl.models.requests import Ledger, LedgerData
+from xrplpers.clients import ClientPool
+from xrplpers.nfts.entities import NFTokenListHelper, _flatten_nft_node
+
+LOW_BITS = 96
+
+
+def _account_int(account) -> int:
+    return int.from_bytes(AccountID.from_value(account).__bytes__(), byteorder="big")
+
+
+def _key_hex(key: int) -> str:
+    return key.to_bytes(32, byteorder="big").hex().upper()
+
+
+def key_ranges(owner, parts=8, issuer=None) -> typing.List[typing.Tuple[int, int]]:
+    """
+    Split the owner's NFTokenPage key space into `parts` inclusive (lo, hi)
+    ranges.
+
+    The low 96 bits of a TokenID are the last 32 bits of the issuer followed
+    by the (scrambled) taxon and the sequence. For a wallet dominated by one
+    issuer, pass `issuer` so the split happens inside that issuer's slice,
+    where scrambled taxons spread tokens evenly; the keys either side of the
+    slice are still covered by one range each.
+    """
+    if parts < 1:
+        raise ValueError("parts must be at least 1")
+    base = _account_int(owner) << LOW_BITS
+    if issuer:
+        start = (_account_int(issuer) & 0xFFFFFFFF) << 64
+        span = 1 << 64
+    else:
+        start = 0
+        span = 1 << LOW_BITS
+    if parts > span:
+        raise ValueError(f"parts must be at most {span}")
+    step = span // parts
+    ranges = []
+    if start:
+        ranges.append((base, base + start - 1))
+    for i in range(parts):
+        hi = start + span - 1 if i == parts - 1 else start + (i + 1) * step - 1
+        ranges.append((base + start + i * step, base + hi))
+    if start + span < 1 << LOW_BITS:
+        ranges.append((base + start + span, base + (1 << LOW_BITS) - 1))
+    return ranges
+
+
+class SnapshotError(Exception):
+    def __init__(self, result=None, *args, **kwargs):
+        super().__init__(args, kwargs)
+        self.result = result
+
+
+class NFTokenSnapshot:
+    """
+    Concurrently walk an account's NFTokenPages and stream the TokenIDs into
+    a NFTokenListHelper.
+
+    `client` is any xrpl-py client (including a `xrplpers.clients.ClientPool`)
+    and `limit` is the number of ledger entries asked for per `ledger_data`
+    call; each page holds up to 32 tokens. With a pool the snapshot is pinned
+    to the newest ledger every healthy node has validated, so any of them
+    can answer each range.
+    """
+
+    def __init__(self, client, account, parts=8, limit=64, issuer=None) -> None:
+        self.client = client
+        self.account = account
+        self.limit = limit
+        self.ranges = key_ranges(account, parts, issuer)
+        # The ledger the last fetch was pinned to
+        self.ledger_index = None
+
+    async def _validated_ledger(self) -> int:
+        if isinstance(self.client, ClientPool):
+            return await self.client.common_ledger()
+        response = await self.client._request_impl(Ledger(ledger_index="validated"))
+        return response.result["ledger_index"]
+
+    async def _fetch_range(self, lo, hi, ledger_index, helper):
+        # ledger_data resumes after the marker, so start one key before lo
+        marker = _key_hex(lo - 1)
+        while marker:
+            response = await self.client._request_impl(
+                LedgerData(ledger_index=ledger_index, marker=marker, limit=self.limit)
+            )
+            if not response.is_successful():
+                raise SnapshotError(response.result)
+            for entry in response.result["state"]:
+                key = int(entry["index"], 16)
+                if key > hi:
+                    return
+                if key >= lo and entry["LedgerEntryType"] == "NFTokenPage":
+                    helper.add_from_list(_flatten_nft_node(entry["NonFungibleTokens"]))
+            marker = response.result.get("marker")
+
+    async def fetch_async(self, helper=None, ledger_index=None) -> NFTokenListHelper:
+        if helper is None:
+            helper = NFTokenListHelper()
+        if ledger_index is None:
+            ledger_index = await self._validated_ledger()
+        self.ledger_index = ledger_index
+        await asyncio.gather(
+            *[self._fetch_range(lo, hi, ledger_index, helper) for lo, hi in self.ranges]
+        )
+        return helper
+
+    def fetch(self, helper=None, ledger_index=None) -> NFTokenListHelper:
+        """
+        Return `helper` (or a new NFTokenListHelper) populated with every
+        TokenID the account holds as of `ledger_index`, defaulting to the
+        latest validated ledger.
+        """
+        return asyncio.run(self.fetch_async(helper, ledger_index))
@@ -0,0 +1,73 @@
+from collections import defaultdict
+from itertools import count
+from pathlib import Path
+import json
+import threading
+import typing
+
+
+class NoRecordingError(Exception):
+    def __init__(self, key=None, *args, **kwargs):
+        super().__init__(args, kwargs)
+        self.key = key
+
+
+def request_key(method: str, path: str, body=None) -> str:
+    """
+    Key an HTTP request for replay. rippled JSON-RPC calls all POST to the
+    same path, so they are keyed on the rippled method instead, which also
+    lets a websocket stand-in replay JSON-RPC recordings.
+    """
+    if isinstance(body, dict) and "method" in body:
+        return f"rippled {body['method']}"
+    return f"{method} {path.split('?')[0].rstrip('/')}"
+
+
+class Cassette:
+    """
+    An ordered list of recorded request/response interactions, stored as JSON.
+
+    Each interaction is a dict with a `key` (see `request_key`), the
+    `request` and the `response` (`status` and `body`). On replay responses
+    are matched by key only and cycled in recorded order, so a handful of
+    recordings can serve a load test of any length.
+    """
+
+    def __init__(self, interactions: typing.List[dict] = None, path=None) -> None:
+        self.interactions = interactions or []
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._index()
+
+    def _index(self):
+        self._by_key = defaultdict(list)
+        for i in self.interactions:
+            self._by_key[i["key"]].append(i["response"])
+        self._counters = defaultdict(count)
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        return cls(json.loads(path.read_text()), path)
+
+    def save(self, path=None):
+        path = Path(path) if path else self.path
+        with self._lock:
+            path.write_text(json.dumps(self.interactions, indent=2))
+
+    def record(self, key: str, request: dict, response: dict):
+        with self._lock:
+            self.interactions.append(
+                {"key": key, "request": request, "response": response}
+            )
+            self._by_key[key].append(response)
+
+    def response_for(self, key: str) -> dict:
+        with self._lock:
+            responses = self._by_key.get(key)
+            if not responses:
+                raise NoRecordingError(key)
+            return responses[next(self._counters[key]) % len(responses)]
+
+    def __len__(self):
+        return len(self.interactions)
@@ -0,0 +1,229 @@
+"""
+Drive the login, verify and mint flows against recorded or live services and
+report latency percentiles and throughput.
+
+Record a cassette through proxies to the real services:
+
+    python -m xrplpers.replay.load record cassette.json --flow login \
+        --xumm https://xumm.app/api/v1
+
+Replay it through local stand-ins with injected faults:
+
+    python -m xrplpers.replay.load run cassette.json --flow login \
+        -n 1000 -c 50 --latency 0.05 --error-rate 0.01 --max-rps 200
+"""
+
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import json
+import math
+from os import environ
+from pathlib import Path
+import tempfile
+import time
+import typing
+from xrpl.clients import JsonRpcClient, WebsocketClient
+from xrpl.wallet import Wallet
+from xrplpers.nfts.entities import NFToken
+from xrplpers.replay.cassette import Cassette
+from xrplpers.replay.servers import Faults, HTTPStandIn, WebsocketStandIn
+from xrplpers.xumm.transactions import verify_signature, xumm_login
+
+
+def login_flow(context):
+    xumm_login()
+
+
+def verify_flow(context):
+    payload = xumm_login()
+    verify_signature({"payloadResponse": {"payload_uuidv4": payload["uuid"]}})
+
+
+def mint_flow(context):
+    if not context.get("seed") or not context.get("rippled_url"):
+        raise ValueError("The mint flow needs a wallet seed and a rippled url")
+    url = context["rippled_url"]
+    wallet = Wallet(context["seed"], 0)
+    if url.startswith("ws"):
+        with WebsocketClient(url) as client:
+            NFToken.mint(wallet, context["uri"], client)
+    else:
+        NFToken.mint(wallet, context["uri"], JsonRpcClient(url))
+
+
+FLOWS = {"login": login_flow, "verify": verify_flow, "mint": mint_flow}
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of `values`, `pct` between 0 and 100.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+@dataclass
+class LoadReport:
+    flow: str
+    duration: float
+    latencies: typing.List[float] = field(default_factory=list)
+    # "ExceptionType: message" -> count, so failing runs say why
+    error_types: typing.Counter[str] = field(default_factory=Counter)
+
+    @property
+    def errors(self):
+        return sum(self.error_types.values())
+
+    @property
+    def requests(self):
+        return len(self.latencies) + self.errors
+
+    @property
+    def p50(self):
+        return percentile(self.latencies, 50)
+
+    @property
+    def p99(self):
+        return percentile(self.latencies, 99)
+
+    @property
+    def throughput(self):
+        return len(self.latencies) / self.duration if self.duration else 0.0
+
+    @property
+    def as_dict(self):
+        return {
+            "flow": self.flow,
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_types": dict(self.error_types),
+            "p50": self.p50,
+            "p99": self.p99,
+            "throughput": self.throughput,
+        }
+
+    def __str__(self) -> str:
+        summary = (
+            f"{self.flow}: {self.requests} requests, {self.errors} errors, "
+            f"p50 {self.p50 * 1000:.1f}ms, p99 {self.p99 * 1000:.1f}ms, "
+            f"{self.throughput:.1f}/s"
+        )
+        errors = [f"  {n} x {e}" for e, n in self.error_types.most_common()]
+        return "\n".join([summary] + errors)
+
+
+def run_load(flow, total=100, concurrency=10, **context) -> LoadReport:
+    """
+    Run `flow` (a name from FLOWS or a callable taking the context dict)
+    `total` times across `concurrency` threads. Failed runs are counted by
+    exception type and message and left out of the latency figures.
+    """
+    name = flow if isinstance(flow, str) else flow.__name__
+    flow = FLOWS[flow] if isinstance(flow, str) else flow
+
+    def timed(_):
+        start = time.monotonic()
+        try:
+            flow(context)
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+        return time.monotonic() - start
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(total)))
+    report = LoadReport(name, time.monotonic() - start)
+    for result in results:
+        if isinstance(result, str):
+            report.error_types[result] += 1
+        else:
+            report.latencies.append(result)
+    return report
+
+
+def _use_xumm(url):
+    environ["XUMM_API_URL"] = url
+    if not environ.get("XUMM_CREDS_PATH") and not Path("creds.json").exists():
+        # Stand-ins ignore credentials, but get_creds still needs a file
+        creds = Path(tempfile.mkdtemp()) / "creds.json"
+        creds.write_text(json.dumps({"x-api-key": "replay", "x-api-secret": "replay"}))
+        environ["XUMM_CREDS_PATH"] = str(creds)
+
+
+def record(args):
+    cassette = Cassette(path=args.cassette)
+    proxies = []
+    context = {"seed": args.seed, "uri": args.uri}
+    if args.xumm:
+        proxies.append(HTTPStandIn(cassette, upstream=args.xumm).start())
+        environ["XUMM_API_URL"] = proxies[-1].url
+    if args.rippled:
+        proxies.append(HTTPStandIn(cassette, upstream=args.rippled).start())
+        context["rippled_url"] = proxies[-1].url
+    try:
+        report = run_load(args.flow, args.requests, 1, **context)
+    finally:
+        for p in proxies:
+            p.stop()
+    cassette.save()
+    print(report)
+    print(f"Recorded {len(cassette)} interactions to {args.cassette}")
+
+
+def replay(args):
+    cassette = Cassette.load(args.cassette)
+    faults = Faults(args.latency, args.jitter, args.error_rate, args.max_rps)
+    http = HTTPStandIn(cassette, faults).start()
+    _use_xumm(http.url)
+    context = {"seed": args.seed, "uri": args.uri, "rippled_url": http.url}
+    ws = None
+    if args.websocket:
+        ws = WebsocketStandIn(cassette, faults).start()
+        context["rippled_url"] = ws.url
+    try:
+        report = run_load(args.flow, args.requests, args.concurrency, **context)
+    finally:
+        http.stop()
+        if ws:
+            ws.stop()
+    print(json.dumps(report.as_dict) if args.json else report)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="Record a cassette from live services")
+    rec.add_argument("--xumm", help="XUMM API root to proxy to")
+    rec.add_argument("--rippled", help="rippled JSON-RPC url to proxy to")
+    rec.add_argument("-n", "--requests", type=int, default=1)
+    rec.set_defaults(func=record)
+
+    run = commands.add_parser("run", help="Load test against a replayed cassette")
+    run.add_argument("-n", "--requests", type=int, default=100)
+    run.add_argument("-c", "--concurrency", type=int, default=10)
+    run.add_argument("--latency", type=float, default=0.0)
+    run.add_argument("--jitter", type=float, default=0.0)
+    run.add_argument("--error-rate", type=float, default=0.0)
+    run.add_argument("--max-rps", type=float, default=None)
+    run.add_argument("--websocket", action="store_true", help="Serve rippled over ws")
+    run.add_argument("--json", action="store_true", help="Print the report as JSON")
+    run.set_defaults(func=replay)
+
+    for p in (rec, run):
+        p.add_argument("cassette")
+        p.add_argument("--flow", choices=FLOWS, default="login")
+        p.add_argument("--seed", help="Wallet seed for the mint flow")
+        p.add_argument("--uri", default="https://example.com/nft")
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
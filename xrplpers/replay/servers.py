@@ -0,0 +1,254 @@
+"""
+Local stand-ins for the XUMM API and rippled that replay a Cassette, with
+injectable latency, errors and throughput caps.
+
+HTTPStandIn serves both the XUMM REST API and rippled JSON-RPC. Given an
+`upstream` it instead proxies to the real service and records what it sees;
+request headers (which carry the XUMM credentials) are never recorded.
+WebsocketStandIn replays rippled recordings over the websocket API.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import threading
+import time
+import typing
+import requests
+import websockets
+from xrplpers.replay.cassette import Cassette, NoRecordingError, request_key
+
+
+@dataclass
+class Faults:
+    """
+    Fault injection for a stand-in: a fixed `latency` plus up to `jitter`
+    seconds of uniform noise per request, a fraction of requests failing
+    (`error_rate`) and an optional cap on requests per second (`max_rps`),
+    which queues requests rather than rejecting them.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    max_rps: typing.Optional[float] = None
+    seed: typing.Optional[int] = None
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def plan(self) -> typing.Tuple[float, bool]:
+        """
+        Return how long to hold the next request and whether it should fail.
+        """
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+            if self.max_rps:
+                now = time.monotonic()
+                slot = max(now, self._next_slot)
+                self._next_slot = slot + 1 / self.max_rps
+                delay += slot - now
+        return delay, fail
+
+
+def _rippled_error(error, request=None):
+    return {"status": "error", "error": error, "request": request}
+
+
+class HTTPStandIn:
+    def __init__(
+        self,
+        cassette: Cassette,
+        faults: Faults = None,
+        upstream: str = None,
+        host="127.0.0.1",
+        port=0,
+    ) -> None:
+        self.cassette = cassette
+        self.faults = faults or Faults()
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.host = host
+        self.port = port
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def handle(self, method, path, headers, raw_body) -> typing.Tuple[int, dict]:
+        try:
+            body = json.loads(raw_body) if raw_body else None
+        except ValueError:
+            body = raw_body.decode()
+        key = request_key(method, path, body)
+        delay, fail = self.faults.plan()
+        time.sleep(delay)
+        if fail:
+            if key.startswith("rippled"):
+                # rippled sheds load with tooBusy rather than an HTTP error
+                return 200, {"result": _rippled_error("tooBusy", body)}
+            return 503, {"error": "Injected failure"}
+        if self.upstream:
+            return self._forward(key, method, path, headers, raw_body, body)
+        try:
+            response = self.cassette.response_for(key)
+        except NoRecordingError:
+            return 404, {"error": f"No recording for {key}"}
+        return response["status"], response["body"]
+
+    def _forward(self, key, method, path, headers, raw_body, body):
+        headers = {
+            k: v
+            for k, v in headers.items()
+            if k.lower() not in ("host", "content-length")
+        }
+        upstream = requests.request(
+            method, f"{self.upstream}{path}", headers=headers, data=raw_body
+        )
+        try:
+            response_body = upstream.json()
+        except ValueError:
+            response_body = upstream.text
+        response = {"status": upstream.status_code, "body": response_body}
+        self.cassette.record(
+            key, {"method": method, "path": path, "body": body}, response
+        )
+        return upstream.status_code, response_body
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                status, body = stand_in.handle(
+                    self.command, self.path, dict(self.headers), raw_body
+                )
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_DELETE = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class WebsocketStandIn:
+    """
+    Replays rippled recordings (keyed `rippled <method>`, e.g. as recorded
+    through HTTPStandIn from JSON-RPC) over the websocket API. Requests on
+    one connection are answered concurrently, as rippled does.
+    """
+
+    def __init__(
+        self, cassette: Cassette, faults: Faults = None, host="127.0.0.1", port=0
+    ) -> None:
+        self.cassette = cassette
+        self.faults = faults or Faults()
+        self.host = host
+        self.port = port
+        self._loop = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def _reply(self, websocket, message):
+        delay, fail = self.faults.plan()
+        await asyncio.sleep(delay)
+        reply = {"id": message.get("id"), "type": "response"}
+        if fail:
+            result = _rippled_error("tooBusy", message)
+        else:
+            try:
+                recorded = self.cassette.response_for(
+                    f"rippled {message.get('command')}"
+                )
+                result = dict(recorded["body"]["result"])
+            except NoRecordingError:
+                result = _rippled_error("unknownCmd", message)
+        status = result.pop("status", "success")
+        if status == "success":
+            reply.update(status=status, result=result)
+        else:
+            reply.update(result, status=status)
+        await websocket.send(json.dumps(reply))
+
+    async def _serve(self, websocket, path=None):
+        replies = set()
+        async for message in websocket:
+            task = asyncio.ensure_future(self._reply(websocket, json.loads(message)))
+            replies.add(task)
+            task.add_done_callback(replies.discard)
+        if replies:
+            await asyncio.wait(replies)
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._server = self._loop.run_until_complete(
+                websockets.serve(self._serve, self.host, self.port)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if not self._loop:
+            return
+
+        async def close():
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
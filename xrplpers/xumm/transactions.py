@@ -24,9 +24,17 @@ def get_creds(path: Path = None):
     return json.loads(creds.read_text())
 
 
+def api_url():
+    """
+    The XUMM API root, overridable with XUMM_API_URL (e.g. to point at a
+    local replay server).
+    """
+    return environ.get("XUMM_API_URL", "https://xumm.app/api/v1").rstrip("/")
+
+
 def verify_signature(payload):
     uuid = payload["payloadResponse"]["payload_uuidv4"]
-    url = f"https://xumm.app/api/v1/platform/payload/{uuid}"
+    url = f"{api_url()}/platform/payload/{uuid}"
     response = call_xumm_api(url)
     tx_data = response
     verifier = TransactionVerifier(tx_data["response"]["hex"])
@@ -49,14 +57,14 @@ def xumm_login(user=None):
 
 
 def submit_xumm_transaction(transaction, **kwargs):
-    url = "https://xumm.app/api/v1/platform/payload"
+    url = f"{api_url()}/platform/payload"
     xumm_payload = kwargs
     xumm_payload["txjson"] = transaction
     return call_xumm_api(url, payload=xumm_payload, method="POST")
 
 
 def get_xumm_transaction(uuid):
-    url = f"https://xumm.app/api/v1/platform/payload/{uuid}"
+    url = f"{api_url()}/platform/payload/{uuid}"
     return call_xumm_api(url)
 
 